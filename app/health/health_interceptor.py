@@ -0,0 +1,45 @@
+"""
+ASGI-level liveness interceptor.
+
+Answers GET /health (and /healthz, /readyz aliases) with a pre-serialized body
+before the request reaches FastAPI routing/middleware, so orchestrator probes
+cost almost nothing. All other traffic is passed through unchanged.
+"""
+
+from __future__ import annotations
+
+from typing import List, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+HEALTH_PATHS = frozenset({"/health", "/healthz", "/readyz"})
+
+_OK_BODY = b'{"status":"ok"}'
+_OK_HEADERS: List[Tuple[bytes, bytes]] = [
+    (b"content-type", b"application/json"),
+    (b"content-length", str(len(_OK_BODY)).encode()),
+]
+_NOT_ALLOWED_BODY = b'{"detail":"Method Not Allowed"}'
+_NOT_ALLOWED_HEADERS: List[Tuple[bytes, bytes]] = [
+    (b"content-type", b"application/json"),
+    (b"content-length", str(len(_NOT_ALLOWED_BODY)).encode()),
+    (b"allow", b"GET"),
+]
+
+
+class HealthCheckInterceptor:
+    """Wrap an ASGI app and short-circuit liveness probes."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] not in HEALTH_PATHS:
+            await self.app(scope, receive, send)
+            return
+        if scope["method"] == "GET":
+            status, headers, body = 200, _OK_HEADERS, _OK_BODY
+        else:
+            status, headers, body = 405, _NOT_ALLOWED_HEADERS, _NOT_ALLOWED_BODY
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -5,9 +5,14 @@ Health check endpoints for ZenGlow Indexer API.
 from __future__ import annotations
 from fastapi import APIRouter, Response
 import os
+import threading
+import time
+import numpy as np
 import psycopg2
+import psycopg2.extensions
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, Any, List, Optional, TypedDict
+from typing import Deque, Dict, Any, List, Optional, TypedDict
 from .system_metrics import get_system_metrics
 
 class ModelRecord(TypedDict, total=False):
@@ -20,19 +25,33 @@ class ModelRecord(TypedDict, total=False):
     throughput_tps: Optional[float]
 
 
+MAX_LAT_SAMPLES = 200
+
+
 @dataclass
 class QueryStats:
     total: int = 0
     cache_hits: Dict[str, int] = field(default_factory=lambda: {"full": 0, "feature": 0, "none": 0})
-    latencies_ms: List[float] = field(default_factory=list)
+    latencies_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=MAX_LAT_SAMPLES))
     last_latency_ms: Optional[float] = None
 
-model_registry: List[ModelRecord] = []
+# Keyed by model name; guarded by _MODEL_LOCK since handlers run in a threadpool
+_MODEL_REGISTRY: Dict[str, ModelRecord] = {}
+_MODEL_LOCK = threading.Lock()
 query_stats = QueryStats()
-MAX_LAT_SAMPLES = 200
+
+# Streaming latency histogram (microsecond resolution, 1us..60s, 3 significant digits).
+# Optional (hdrh): feeds the cumulative-since-start percentiles (cumulative_p*_ms),
+# read in O(buckets). p50/p95/p99_ms stay windowed over latencies_ms.
+_HDR_MAX_US = 60_000_000
+try:
+    from hdrh.histogram import HdrHistogram  # type: ignore
+
+    _LATENCY_HDR: Optional[Any] = HdrHistogram(1, _HDR_MAX_US, 3)
+except Exception:  # pragma: no cover - optional dependency
+    _LATENCY_HDR = None
 
 def register_model(name: str, family: str, quant: Optional[str] = None, context_len: Optional[int] = None, role: Optional[str] = None, loaded: bool = False, throughput_tps: Optional[float] = None) -> None:
-    existing = next((m for m in model_registry if m["name"] == name), None)
     record: ModelRecord = ModelRecord(
         name=name,
         family=family,
@@ -42,19 +61,19 @@ def register_model(name: str, family: str, quant: Optional[str] = None, context_
         loaded=loaded,
         throughput_tps=throughput_tps,
     )
-    if existing:
-        existing.update(record)  # type: ignore[arg-type]
-    else:
-        model_registry.append(record)
+    with _MODEL_LOCK:
+        _MODEL_REGISTRY[name] = record
 
 # Seed (can be updated at startup elsewhere)
 register_model("gemma:2b", family="gemma", quant="q4_0", context_len=8192, role="generation", loaded=True, throughput_tps=35.0)
 register_model("bge-small", family="bge", quant="fp16", context_len=1024, role="embedding", loaded=False, throughput_tps=120.0)
 
 def get_model_registry() -> List[ModelRecord]:
-    return list(model_registry)
+    with _MODEL_LOCK:
+        return list(_MODEL_REGISTRY.values())
 
 def record_query_stats(latency_sec: float, cache_hit: str) -> None:  # called from ranking_router
+    global _SNAPSHOT_DIRTY
     ms = latency_sec * 1000.0
     query_stats.total += 1
     if cache_hit not in query_stats.cache_hits:
@@ -62,20 +81,42 @@ def record_query_stats(latency_sec: float, cache_hit: str) -> None:  # called fr
     query_stats.cache_hits[cache_hit] += 1
     query_stats.last_latency_ms = ms
     query_stats.latencies_ms.append(ms)
-    if len(query_stats.latencies_ms) > MAX_LAT_SAMPLES:
-        query_stats.latencies_ms = query_stats.latencies_ms[-MAX_LAT_SAMPLES:]
+    if _LATENCY_HDR is not None:
+        _LATENCY_HDR.record_value(min(max(int(ms * 1000.0), 1), _HDR_MAX_US))
+    _SNAPSHOT_DIRTY = True
+
+# Snapshot is rebuilt only after new stats are recorded; scrapes in between reuse it.
+_SNAPSHOT_DIRTY = True
+_SNAPSHOT_LOCK = threading.Lock()
+_SNAPSHOT_CACHE: Dict[str, Any] = {}
 
 def get_query_stats_snapshot() -> Dict[str, Any]:
-    lat: List[float] = query_stats.latencies_ms
+    """Return the cached stats snapshot (shared; treat as read-only)."""
+    global _SNAPSHOT_DIRTY, _SNAPSHOT_CACHE
+    with _SNAPSHOT_LOCK:
+        if _SNAPSHOT_DIRTY:
+            # Clear first so a record landing mid-build marks the snapshot dirty again
+            _SNAPSHOT_DIRTY = False
+            _SNAPSHOT_CACHE = _build_query_stats_snapshot()
+        return _SNAPSHOT_CACHE
+
+def _build_query_stats_snapshot() -> Dict[str, Any]:
+    lat: Deque[float] = query_stats.latencies_ms
     p50: Optional[float] = None
     p95: Optional[float] = None
     p99: Optional[float] = None
     if lat:
-        ordered: List[float] = sorted(lat)
-        n = len(ordered) - 1
-        p50 = ordered[int(0.5 * n)]
-        p95 = ordered[int(0.95 * n)]
-        p99 = ordered[int(0.99 * n)]
+        # Windowed over the recent samples; "lower" keeps the previous floor-index semantics.
+        arr = np.fromiter(lat, dtype=np.float64, count=len(lat))
+        p50, p95, p99 = (float(v) for v in np.percentile(arr, [50, 95, 99], method="lower"))
+    cum50: Optional[float] = None
+    cum95: Optional[float] = None
+    cum99: Optional[float] = None
+    if _LATENCY_HDR is not None and _LATENCY_HDR.get_total_count():
+        pct_us = _LATENCY_HDR.get_percentile_to_value_dict([50, 95, 99])
+        cum50 = pct_us[50] / 1000.0
+        cum95 = pct_us[95] / 1000.0
+        cum99 = pct_us[99] / 1000.0
     snapshot: Dict[str, Any] = {
         "total": query_stats.total,
         "cache_hits": dict(query_stats.cache_hits),
@@ -84,6 +125,9 @@ def get_query_stats_snapshot() -> Dict[str, Any]:
         "p50_ms": p50,
         "p95_ms": p95,
         "p99_ms": p99,
+        "cumulative_p50_ms": cum50,
+        "cumulative_p95_ms": cum95,
+        "cumulative_p99_ms": cum99,
     }
     return snapshot
 
@@ -101,21 +145,75 @@ def health_ollama() -> Dict[str, Any]:
     # TODO: Implement real check
     return {"ollama": "ok (stub)"}
 
-@health_router.get("/health/db")
-def health_db() -> Dict[str, Any]:
-    """Check DB health by connecting and running SELECT 1."""
-    dsn = os.getenv("DATABASE_URL")
+# DB probe results are cached for HEALTH_DB_TTL seconds so frequent probes do not
+# each hit Postgres; the probe itself reuses one long-lived connection that is only
+# re-opened after a failure.
+_DB_HEALTH_TTL = float(os.getenv("HEALTH_DB_TTL", "5"))
+_DB_HEALTH_STATEMENT_TIMEOUT_MS = int(os.getenv("HEALTH_DB_STATEMENT_TIMEOUT_MS", "2000"))
+_DB_HEALTH: Dict[str, Any] = {"result": {"db": "unknown"}, "ts": 0.0}
+_DB_HEALTH_LOCK = threading.Lock()
+_HEALTH_CONN: Optional[psycopg2.extensions.connection] = None
+
+
+def _get_health_conn() -> psycopg2.extensions.connection:
+    global _HEALTH_CONN
+    if _HEALTH_CONN is None or _HEALTH_CONN.closed:
+        _HEALTH_CONN = psycopg2.connect(  # type: ignore[arg-type]
+            os.getenv("DATABASE_URL"),
+            connect_timeout=max(1, _DB_HEALTH_STATEMENT_TIMEOUT_MS // 1000),
+            options=f"-c statement_timeout={_DB_HEALTH_STATEMENT_TIMEOUT_MS}",
+        )
+        _HEALTH_CONN.autocommit = True
+    return _HEALTH_CONN
+
+
+def _drop_health_conn() -> None:
+    global _HEALTH_CONN
+    if _HEALTH_CONN is not None:
+        try:
+            _HEALTH_CONN.close()
+        except Exception:
+            pass
+    _HEALTH_CONN = None
+
+
+def _select_one(conn: psycopg2.extensions.connection) -> Any:
+    with conn.cursor() as cur:
+        cur.execute("SELECT 1;")
+        return cur.fetchone()
+
+
+def _probe_db() -> Dict[str, Any]:
     try:
-        with psycopg2.connect(dsn) as conn:  # type: ignore[arg-type]
-            with conn.cursor() as cur:
-                cur.execute("SELECT 1;")
-                result = cur.fetchone()
+        reused = _HEALTH_CONN is not None and not _HEALTH_CONN.closed
+        try:
+            result = _select_one(_get_health_conn())
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            if not reused:
+                raise
+            # Kept connection went stale (e.g. Postgres restarted): retry once on a fresh one
+            _drop_health_conn()
+            result = _select_one(_get_health_conn())
         if not result:
             return {"db": "fail", "error": "no result"}
         return {"db": "ok", "result": result[0]}
     except Exception as e:  # pragma: no cover - environmental
+        # Reconnect on the next probe rather than reusing a possibly broken socket
+        _drop_health_conn()
         return {"db": "fail", "error": str(e)}
 
+
+@health_router.get("/health/db")
+def health_db() -> Dict[str, Any]:
+    """Check DB health via SELECT 1 (cached for HEALTH_DB_TTL seconds)."""
+    with _DB_HEALTH_LOCK:
+        if time.monotonic() - _DB_HEALTH["ts"] < _DB_HEALTH_TTL:
+            return dict(_DB_HEALTH["result"])
+        result = _probe_db()
+        _DB_HEALTH["result"] = result
+        _DB_HEALTH["ts"] = time.monotonic()
+        return dict(result)
+
 @health_router.get("/health/models")
 def health_models() -> Dict[str, Any]:
     """Return model registry metadata."""
@@ -141,9 +239,33 @@ try:
         buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0),
     )
 
+    # Pre-bound label children for the known (endpoint, cache_hit) pairs so the hot path
+    # skips the labels() lookup; unknown pairs fall back to labels() and are memoized.
+    _QUERY_COUNT_CHILDREN: Dict[tuple, Any] = {
+        (e, c): RAG_QUERY_COUNT.labels(endpoint=e, cache_hit=c)
+        for e in ("query2",)
+        for c in ("full", "feature", "none")
+    }
+
+    def inc_query(endpoint: str, cache_hit: str) -> None:
+        child = _QUERY_COUNT_CHILDREN.get((endpoint, cache_hit))
+        if child is None:
+            child = _QUERY_COUNT_CHILDREN[(endpoint, cache_hit)] = RAG_QUERY_COUNT.labels(
+                endpoint=endpoint, cache_hit=cache_hit
+            )
+        child.inc()
+
+    # Exposition output is reused for METRICS_CACHE_TTL seconds to absorb concurrent scrapes
+    METRICS_CACHE_TTL = float(os.getenv("METRICS_CACHE_TTL", "1"))
+    _METRICS_CACHE: Dict[str, Any] = {"body": b"", "ts": 0.0}
+
     @health_router.get("/metrics")
     def metrics_endpoint() -> Response:  # pragma: no cover (exposed for Prometheus)
-        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+        now = time.monotonic()
+        if now - _METRICS_CACHE["ts"] >= METRICS_CACHE_TTL:
+            _METRICS_CACHE["body"] = generate_latest()
+            _METRICS_CACHE["ts"] = now
+        return Response(_METRICS_CACHE["body"], media_type=CONTENT_TYPE_LATEST)
 except Exception:  # pragma: no cover - metrics optional if dependency missing
     @health_router.get("/metrics")
     def metrics_endpoint() -> Response:  # type: ignore[unused-ignore]
@@ -6,11 +6,13 @@ Order of operations on import:
 Then import remainder of modules relying on configuration.
 """
 
-from fastapi import FastAPI, Request, Depends
+import asyncio
+from fastapi import FastAPI, Depends, HTTPException
 from fastapi.staticfiles import StaticFiles
 from typing import Dict, Any, List
 from app.rag.schemas import RAGQueryRequest, RAGQueryResponse, RetrievedChunk
 from app.health.health_router import health_router
+from app.health.health_interceptor import HealthCheckInterceptor
 from typing import Generator
 
 from app.core.config import apply_backward_compat_env, validate_required_env, config_router
@@ -28,33 +30,37 @@ except RuntimeError as e:  # pragma: no cover - startup failure path
     raise
 
 from app.rag.pipeline import RAGPipeline
-from app.rag.db_client import DBClient
+from app.rag.db_client import DBClient, PoolExhaustedError
 from app.rag.embedder import Embedder
 from app.rag.llm_client import LLMClient
 from app.rag.ranking_router import router as ranking_router
-from app.rag.ranking_router import rag_query2  # reuse logic for legacy endpoint refactor
+# reuse logic for legacy endpoint refactor
+from app.rag.ranking_router import rag_query2, Query2Payload
 from app.audio import transcription_router
 
 # Legacy imports (can be deprecated once new pipeline stable)
 # Legacy direct embedding/retrieval removed; use ranking_router logic instead. Edge LLM kept for answer generation.
 from app.rag.edge_llm import get_edge_model_response  # Note: legacy direct embedding/retrieval removed; relies on ranking_router
 
-app: FastAPI = FastAPI(title="ZenGlow Indexer API")
-app.include_router(health_router)
-app.include_router(ranking_router)
-app.include_router(transcription_router.router)
-app.include_router(config_router)
+fastapi_app: FastAPI = FastAPI(title="ZenGlow Indexer API")
+fastapi_app.include_router(health_router)
+fastapi_app.include_router(ranking_router)
+fastapi_app.include_router(transcription_router.router)
+fastapi_app.include_router(config_router)
 
 # Static assets (voice UI)
 try:
-    app.mount("/static", StaticFiles(directory="app/static"), name="static")
+    fastapi_app.mount("/static", StaticFiles(directory="app/static"), name="static")
 except Exception:
     # Directory might not exist in some deploy contexts; fail soft
     pass
 
 
 def get_rag_pipeline() -> Generator[RAGPipeline, None, None]:
-    db_client = DBClient()
+    try:
+        db_client = DBClient()
+    except PoolExhaustedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     embedder = Embedder()
     llm = LLMClient()
     pipeline = RAGPipeline(db_client=db_client, embedder=embedder, llm_client=llm)
@@ -63,39 +69,45 @@ def get_rag_pipeline() -> Generator[RAGPipeline, None, None]:
     finally:
         db_client.close()
 
-@app.post("/rag/query")  # Refactored legacy endpoint: delegates scoring to /rag/query2 logic
-async def rag_query(request: Request) -> Dict[str, Any]:
-    body = await request.json()
-    query = body.get("query")
-    top_k = body.get("top_k", 5)
-    if not query:
+# Refactored legacy endpoint: delegates scoring to /rag/query2 logic
+@fastapi_app.post("/rag/query")
+async def rag_query(payload: RAGQueryRequest) -> Dict[str, Any]:
+    # Body is validated by FastAPI/Pydantic (missing query -> 422)
+    query = payload.query
+    top_k = payload.top_k
+    if not query.strip():
         return {"error": "Missing query"}
 
-    # Reuse rag_query2 internal logic for retrieval + scoring (simulate payload)
-    ranking_payload = type("Tmp", (), {"query": query, "top_k": top_k})()
+    # Reuse rag_query2 internal logic for retrieval + scoring
+    ranking_payload = Query2Payload(query=query, top_k=top_k)
     try:
         ranked = await rag_query2(ranking_payload)  # returns dict with results/items
     except Exception as e:  # fallback returns error reason only (legacy retrieval removed)
         # If this fires frequently add diagnostics for ranking_router
         return {"chunks": [], "answer": None, "error": "retrieval_failed", "detail": str(e)}
 
-    # Build answer using fused ranked chunks
+    # Build context and legacy chunk shape in a single pass over fused ranked chunks
     ranked_results = ranked.get("results", [])[:top_k]
-    context = "\n---\n".join([r.get("text_preview", "") for r in ranked_results])
+    previews: List[str] = []
+    legacy_chunks: List[Dict[str, Any]] = []
+    for r in ranked_results:
+        preview = r.get("text_preview")
+        previews.append(preview or "")
+        legacy_chunks.append(
+            {
+                "id": r.get("chunk_id"),
+                "chunk": preview,
+                "score": r.get("fused_score"),
+                "ltr_score": r.get("ltr_score"),
+                "conceptual_score": r.get("conceptual_score"),
+                "distance": r.get("distance"),
+            }
+        )
+    context = "\n---\n".join(previews)
     prompt = f"You are ZenGlow Assistant. Use context to answer.\nContext:\n{context}\nQuestion: {query}\nAnswer:"
-    answer = get_edge_model_response(prompt)
+    # Blocking HTTP call: run in a worker thread so the event loop keeps serving requests
+    answer = await asyncio.to_thread(get_edge_model_response, prompt)
     # Return legacy shape + new scoring metadata
-    legacy_chunks = [
-        {
-            "id": r.get("chunk_id"),
-            "chunk": r.get("text_preview"),
-            "score": r.get("fused_score"),
-            "ltr_score": r.get("ltr_score"),
-            "conceptual_score": r.get("conceptual_score"),
-            "distance": r.get("distance"),
-        }
-        for r in ranked_results
-    ]
     return {
         "chunks": legacy_chunks,
         "answer": answer,
@@ -106,8 +118,13 @@ async def rag_query(request: Request) -> Dict[str, Any]:
     }
 
 
-@app.post("/rag/pipeline", response_model=RAGQueryResponse)
+@fastapi_app.post("/rag/pipeline", response_model=RAGQueryResponse)
 async def rag_pipeline_endpoint(payload: RAGQueryRequest, pipeline: RAGPipeline = Depends(get_rag_pipeline)) -> RAGQueryResponse:
-    answer = pipeline.run(query=payload.query, top_k=payload.top_k)
+    answer = await asyncio.to_thread(pipeline.run, query=payload.query, top_k=payload.top_k)
     # For now we don't surface chunk scores since db_client stub doesn't provide them
     return RAGQueryResponse(answer=answer, chunks=[])
+
+
+# ASGI entrypoint: liveness probes (/health, /healthz, /readyz) are answered by the
+# interceptor without entering FastAPI; everything else is forwarded to fastapi_app.
+app = HealthCheckInterceptor(fastapi_app)
@@ -1,28 +1,83 @@
 """
 DB Client for Vector Search (pgvector, Timescale)
+
+Connections come from a process-wide ThreadedConnectionPool (created on first
+use, sized by PG_POOL_MAX) so per-request clients do not pay a new handshake.
+ThreadedConnectionPool.getconn() raises instead of waiting when exhausted, so a
+semaphore sized to the pool makes callers wait up to PG_POOL_TIMEOUT seconds for
+a slot; if none frees up, PoolExhaustedError is raised so PG_POOL_MAX stays a hard
+cap on backend connections.
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+import atexit
+import threading
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
 import os
 
+_PG_POOL: Optional[psycopg2.pool.ThreadedConnectionPool] = None
+_PG_POOL_SLOTS: Optional[threading.BoundedSemaphore] = None
+_PG_POOL_LOCK = threading.Lock()
+PG_POOL_TIMEOUT = float(os.getenv("PG_POOL_TIMEOUT", "5"))
+
+
+class PoolExhaustedError(RuntimeError):
+    """No pooled connection became free within PG_POOL_TIMEOUT."""
+
+
+def _conn_kwargs() -> Dict[str, Any]:
+    return {
+        "dbname": os.getenv("PG_DB", "rag_db"),
+        "user": os.getenv("PG_USER", "postgres"),
+        "password": os.getenv("PG_PASSWORD", "password"),
+        "host": os.getenv("PG_HOST", "localhost"),
+        "port": int(os.getenv("PG_PORT", "5432")),
+    }
+
+
+def _get_pool() -> psycopg2.pool.ThreadedConnectionPool:
+    global _PG_POOL, _PG_POOL_SLOTS
+    if _PG_POOL is None:
+        with _PG_POOL_LOCK:
+            if _PG_POOL is None:
+                maxconn = int(os.getenv("PG_POOL_MAX", "8"))
+                _PG_POOL = psycopg2.pool.ThreadedConnectionPool(1, maxconn, **_conn_kwargs())
+                _PG_POOL_SLOTS = threading.BoundedSemaphore(maxconn)
+                atexit.register(_PG_POOL.closeall)
+    return _PG_POOL
+
+
+def to_vector_literal(embedding: List[float]) -> str:
+    """Render an embedding in pgvector's text input form ([x1,x2,...])."""
+    return "[" + ",".join(map(str, embedding)) + "]"
+
+
 class DBClient:
     def __init__(self):
-        self.conn = psycopg2.connect(
-            dbname=os.getenv("PG_DB", "rag_db"),
-            user=os.getenv("PG_USER", "postgres"),
-            password=os.getenv("PG_PASSWORD", "password"),
-            host=os.getenv("PG_HOST", "localhost"),
-            port=int(os.getenv("PG_PORT", "5432"))
-        )
+        pool = _get_pool()
+        assert _PG_POOL_SLOTS is not None
+        self.conn = None
+        if not _PG_POOL_SLOTS.acquire(timeout=PG_POOL_TIMEOUT):
+            raise PoolExhaustedError(f"no DB connection free within {PG_POOL_TIMEOUT}s")
+        try:
+            self.conn = pool.getconn()
+        except Exception:
+            _PG_POOL_SLOTS.release()
+            raise
         self.conn.autocommit = True
 
     def close(self):
+        if self.conn is None:
+            return
+        conn, self.conn = self.conn, None
         try:
-            if self.conn and not self.conn.closed:
-                self.conn.close()
+            _get_pool().putconn(conn, close=bool(conn.closed))
         except Exception:
             pass
+        finally:
+            if _PG_POOL_SLOTS is not None:
+                _PG_POOL_SLOTS.release()
 
     def __enter__(self):
         return self
@@ -41,14 +96,16 @@ class DBClient:
         if not embedding:
             return []
         with self.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+            # Vector is bound once; ordering by the distance alias keeps the
+            # `embedding <-> const` sort expression so ANN indexes still apply.
             cur.execute(
                 """
-                SELECT id, text, metadata, (embedding <-> %s)::float AS distance
+                SELECT id, text, metadata, embedding <-> %s::vector AS distance
                 FROM doc_embeddings
-                ORDER BY embedding <-> %s
+                ORDER BY distance
                 LIMIT %s
                 """,
-                (embedding, embedding, top_k),
+                (to_vector_literal(embedding), top_k),
             )
             rows = cur.fetchall() or []
             return [
@@ -2,7 +2,9 @@
 from __future__ import annotations
 
 import os
+import time
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Optional
 
 SUPABASE_EDGE_URL = os.getenv("SUPABASE_URL")
@@ -11,11 +13,41 @@ EDGE_FUNCTION_NAME = os.getenv("SUPABASE_EDGE_FUNCTION", "get_gemma_response")
 OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "gemma:2b")
 
+# Shared keep-alive session: avoids a fresh TCP/TLS handshake per generation call
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=8, pool_maxsize=32)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
+# Edge reachability cache: after a failure the edge is skipped for EDGE_HEALTH_TTL seconds,
+# then re-probed with a cheap HEAD before being used again.
+EDGE_HEALTH_TTL = float(os.getenv("LLM_EDGE_HEALTH_TTL", "30"))
+EDGE_TIMEOUT = (2.0, float(os.getenv("LLM_EDGE_READ_TIMEOUT", "30")))  # (connect, read)
+_EDGE_HEALTH = {"ok": True, "ts": 0.0}
+
+
+def _mark_edge(ok: bool) -> None:
+    _EDGE_HEALTH["ok"] = ok
+    _EDGE_HEALTH["ts"] = time.monotonic()
+
+
+def _edge_available() -> bool:
+    if _EDGE_HEALTH["ok"]:
+        return True
+    if time.monotonic() - _EDGE_HEALTH["ts"] < EDGE_HEALTH_TTL:
+        return False
+    try:
+        resp = _SESSION.head(f"{SUPABASE_EDGE_URL}/functions/v1/", timeout=(2.0, 2.0))
+        _mark_edge(resp.status_code < 500)
+    except Exception:
+        _mark_edge(False)
+    return bool(_EDGE_HEALTH["ok"])
+
 
 class LLMClient:
     def generate(self, prompt: str, temperature: float = 0.2, max_tokens: int = 512) -> str:
-        # Try edge function first if configured
-        if SUPABASE_EDGE_URL and SUPABASE_EDGE_KEY:
+        # Try edge function first if configured and not known to be down
+        if SUPABASE_EDGE_URL and SUPABASE_EDGE_KEY and _edge_available():
             edge_resp = self._invoke_edge(prompt, temperature, max_tokens)
             if edge_resp:
                 return edge_resp
@@ -29,27 +61,29 @@ class LLMClient:
                 "Content-Type": "application/json",
                 "Authorization": f"Bearer {SUPABASE_EDGE_KEY}",
             }
-            resp = requests.post(
+            resp = _SESSION.post(
                 fn_url,
                 json={
                     "prompt": prompt,
                     "temperature": temperature,
                     "max_tokens": max_tokens,
                 },
-                timeout=120,
+                timeout=EDGE_TIMEOUT,
                 headers=headers,
             )
+            if resp.status_code >= 500:
+                _mark_edge(False)
             if resp.status_code == 200:
                 data = resp.json()
                 # Support multiple possible keys
                 return data.get("output") or data.get("response") or data.get("text") or str(data)
         except Exception:
-            pass
+            _mark_edge(False)
         return None
 
     def _invoke_ollama(self, prompt: str, temperature: float, max_tokens: int) -> str:
         try:
-            resp = requests.post(
+            resp = _SESSION.post(
                 f"{OLLAMA_URL}/api/generate",
                 json={
                     "model": OLLAMA_MODEL,
@@ -11,24 +11,26 @@ from __future__ import annotations
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
-from typing import List, Any, Dict
+from typing import Callable, List, Any, Dict, Optional
 import os
 import time
 import psycopg2  # type: ignore
 
 from .feature_assembler import assemble_features, Candidate, FEATURE_SCHEMA_VERSION
 from .ltr import GLOBAL_LTR_MODEL
+from .db_client import to_vector_literal
 from app.core.redis_cache import (
     get_cached_rag_query,
     cache_rag_query_result,
     cache_get_msgpack,
     cache_set_msgpack,
 )  # type: ignore
+inc_query: Optional[Callable[[str, str], None]]
 try:
-    from app.health.health_router import RAG_QUERY_COUNT, RAG_QUERY_LATENCY  # type: ignore
+    from app.health.health_router import RAG_QUERY_LATENCY, inc_query  # type: ignore
 except Exception:  # pragma: no cover
-    RAG_QUERY_COUNT = None
     RAG_QUERY_LATENCY = None
+    inc_query = None
 
 router = APIRouter(prefix="/rag", tags=["rag-advanced"])
 
@@ -110,13 +112,13 @@ def _similarity_search_pgvector(query_vec: List[float], k: int) -> List[Candidat
         """
         SELECT id, chunk, embedding <-> %s::vector AS dist, source
         FROM doc_embeddings
-        ORDER BY embedding <-> %s::vector
+        ORDER BY dist
         LIMIT %s
         """
     )
     with _pg_connect() as conn:
         with conn.cursor() as cur:
-            cur.execute(sql, (query_vec, query_vec, k))
+            cur.execute(sql, (to_vector_literal(query_vec), k))
             rows = cur.fetchall()
     cands: List[Candidate] = []
     for r in rows:
@@ -162,9 +164,9 @@ async def rag_query2(payload: Query2Payload) -> Dict[str, Any]:
             and abs(fw.get("ltr", -1) - cur_w_ltr) < 1e-9
             and abs(fw.get("conceptual", -1) - cur_w_concept) < 1e-9
         ):
-            if RAG_QUERY_COUNT:
+            if inc_query is not None:
                 try:
-                    RAG_QUERY_COUNT.labels(endpoint="query2", cache_hit="full").inc()
+                    inc_query("query2", "full")
                 except Exception:
                     pass
             return cached  # weights match, safe reuse
@@ -276,9 +278,9 @@ async def rag_query2(payload: Query2Payload) -> Dict[str, Any]:
     enriched.sort(key=lambda x: x["fused_score"], reverse=True)
     fusion_end = time.perf_counter()
     fusion_ms = (fusion_end - fusion_start) * 1000.0
-    if RAG_QUERY_COUNT:
+    if inc_query is not None:
         try:
-            RAG_QUERY_COUNT.labels(endpoint="query2", cache_hit=cache_hit_type).inc()
+            inc_query("query2", cache_hit_type)
         except Exception:
             pass
     elapsed = time.perf_counter() - timer_start
@@ -9,9 +9,15 @@ Env Vars:
   DATABASE_URL (required)     - Postgres DSN with pgvector
   EMBED_ENDPOINT (optional)   - HTTP endpoint that accepts {"texts": [...]} and returns {"embeddings": [...]}
                                 default: http://127.0.0.1:8000/model/embed
-  BATCH_SIZE (optional)       - Number of memory lines to batch per embedding call (default 16)
+  EMBED_MAX_BATCH (optional)  - Number of memory lines to batch per embedding call (default 64;
+                                BATCH_SIZE accepted as legacy alias)
+  EMBED_FLUSH_BATCHES (optional) - Embedding batches to accumulate before writing rows, marking
+                                hashes, committing and advancing the offset (default 8)
   LOOP_INTERVAL (optional)    - Seconds to sleep between polling cycles (default 2)
 
+The read offset is persisted next to the memory file as `<MEMORY_FILE_PATH>.offset`
+so restarts resume from the last ingested byte instead of re-reading the whole file.
+
 CLI Usage:
   python memory_rag_bridge.py --once      # Run single sync pass then exit
   python memory_rag_bridge.py --search "query text" --top-k 5
@@ -22,19 +28,23 @@ Assumptions:
       id (string/number), content (string), created_at (ISO) or timestamp.
     If fields differ, map them in `_extract_text`.
   * Duplicate prevention via storing a hash of content in doc_embeddings.batch_tag or using a dedicated table.
+    The hash is xxh3_128 (32 hex chars); it is only a dedup key, not a security boundary.
 """
 from __future__ import annotations
-import os, time, json, hashlib, argparse, sys
+import os, time, json, argparse, sys, io, csv
 from dataclasses import dataclass
 from typing import List, Optional
 import psycopg2
 from psycopg2.extras import execute_values
 import requests
+import xxhash
+from requests.adapters import HTTPAdapter
 
 EMBED_ENDPOINT = os.getenv("EMBED_ENDPOINT", "http://127.0.0.1:8000/model/embed")
 DSN = os.getenv("DATABASE_URL")
 MEM_PATH = os.getenv("MEMORY_FILE_PATH")
-BATCH_SIZE = int(os.getenv("BATCH_SIZE", "16"))
+BATCH_SIZE = int(os.getenv("EMBED_MAX_BATCH", os.getenv("BATCH_SIZE", "64")))
+FLUSH_BATCHES = max(1, int(os.getenv("EMBED_FLUSH_BATCHES", "8")))
 LOOP_INTERVAL = float(os.getenv("LOOP_INTERVAL", "2"))
 
 if not DSN:
@@ -42,11 +52,18 @@ if not DSN:
 if not MEM_PATH:
     print("[bridge] MEMORY_FILE_PATH not set", file=sys.stderr)
 
+# Keep-alive session so successive embedding batches reuse one connection
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=2)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
 @dataclass
 class MemoryLine:
     raw: dict
     text: str
     content_hash: str
+    end_offset: int = 0  # byte offset just past this line in the memory file
 
 def _extract_text(obj: dict) -> str:
     # Adaptable mapping logic.
@@ -62,6 +79,20 @@ def _extract_text(obj: dict) -> str:
             parts.append(v)
     return " | ".join(parts)
 
+def content_hash(txt: str) -> str:
+    return xxhash.xxh3_128_hexdigest(txt.encode('utf-8'))
+
+def _migrate_legacy_hashes(conn, hashes: set) -> set:
+    # Earlier versions stored SHA-256 (64 hex chars). Re-key already ingested memory
+    # chunks with the current hash so they are not embedded again, then drop the old keys.
+    with conn.cursor() as cur:
+        cur.execute("SELECT chunk FROM doc_embeddings WHERE source='memory'")
+        migrated = {content_hash(r[0]) for r in cur.fetchall()}
+        cur.execute("DELETE FROM memory_ingest_dedup WHERE length(content_hash) = 64")
+    if migrated:
+        mark_hashes(conn, list(migrated))
+    return {h for h in hashes if len(h) != 64} | migrated
+
 def load_ingested_hashes(conn) -> set:
     with conn.cursor() as cur:
         cur.execute("""
@@ -71,7 +102,10 @@ def load_ingested_hashes(conn) -> set:
             );
         """)
         cur.execute("SELECT content_hash FROM memory_ingest_dedup")
-        return {r[0] for r in cur.fetchall()}
+        hashes = {r[0] for r in cur.fetchall()}
+    if any(len(h) == 64 for h in hashes):
+        hashes = _migrate_legacy_hashes(conn, hashes)
+    return hashes
 
 def mark_hashes(conn, hashes: List[str]):
     with conn.cursor() as cur:
@@ -80,28 +114,61 @@ def mark_hashes(conn, hashes: List[str]):
             [(h,) for h in hashes])
 
 def embed_texts(texts: List[str]) -> List[List[float]]:
-    r = requests.post(EMBED_ENDPOINT, json={"texts": texts}, timeout=120)
+    r = _SESSION.post(EMBED_ENDPOINT, json={"texts": texts}, timeout=120)
     r.raise_for_status()
     data = r.json()
     return data['embeddings']
 
+def _vector_literal(vec: List[float]) -> str:
+    # pgvector text input format: [x1,x2,...]
+    return "[" + ",".join(map(str, vec)) + "]"
+
 def insert_embeddings(conn, mems: List[MemoryLine], vectors: List[List[float]]):
-    rows = []
+    # Stream rows through COPY (CSV) rather than a multi-row INSERT so psycopg2 does not
+    # adapt every float into an ARRAY[...] literal; doc_embeddings has no natural key, so
+    # the former ON CONFLICT DO NOTHING never fired (dedup lives in memory_ingest_dedup).
+    buf = io.StringIO()
+    writer = csv.writer(buf)
     for m, vec in zip(mems, vectors):
-        rows.append(("memory", m.text, vec, m.content_hash))
+        writer.writerow(("memory", m.text, _vector_literal(vec), m.content_hash))
+    buf.seek(0)
     with conn.cursor() as cur:
-        execute_values(cur,
-            "INSERT INTO doc_embeddings (source, chunk, embedding, batch_tag) VALUES %s ON CONFLICT DO NOTHING",
-            rows)
+        cur.copy_expert(
+            "COPY doc_embeddings (source, chunk, embedding, batch_tag) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buf)
+
+def _offset_path(mem_path: str) -> str:
+    return mem_path + '.offset'
+
+def load_offset(mem_path: str) -> int:
+    # Resume from the sidecar offset; start over if the memory file was truncated/replaced.
+    try:
+        with open(_offset_path(mem_path), 'r', encoding='utf-8') as f:
+            offset = int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+    try:
+        if offset > os.path.getsize(mem_path):
+            return 0
+    except OSError:
+        return 0
+    return offset
 
-def tail_once(state):
+def save_offset(mem_path: str, offset: int):
+    tmp = _offset_path(mem_path) + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(str(offset))
+    os.replace(tmp, _offset_path(mem_path))
+
+def tail_once(mem_path: str, state):
     new_lines = []
-    with open(MEM_PATH, 'r', encoding='utf-8', errors='ignore') as f:
+    with open(mem_path, 'r', encoding='utf-8', errors='ignore') as f:
         f.seek(state['offset'])
         while True:
-            pos = f.tell()
             line = f.readline()
-            if not line:
+            if not line or not line.endswith('\n'):
+                # EOF or a line still being written; pick it up next pass
                 break
             state['offset'] = f.tell()
             line=line.strip()
@@ -114,29 +181,46 @@ def tail_once(state):
             txt=_extract_text(obj)
             if not txt:
                 continue
-            h=hashlib.sha256(txt.encode('utf-8')).hexdigest()
-            new_lines.append(MemoryLine(obj, txt, h))
+            h=content_hash(txt)
+            new_lines.append(MemoryLine(obj, txt, h, state['offset']))
     return new_lines
 
-def process_new():
+def _flush(conn, mem_path: str, mems: List[MemoryLine], vecs: List[List[float]], dedup: set,
+           offset: int):
+    if mems:
+        insert_embeddings(conn, mems, vecs)
+        mark_hashes(conn, [m.content_hash for m in mems])
+        dedup.update(m.content_hash for m in mems)
+        print(f"[bridge] Ingested {len(mems)} new memory lines")
+    # Commit before advancing the sidecar so a crash never skips unwritten lines
+    conn.commit()
+    save_offset(mem_path, offset)
+
+def process_new(once: bool = False):
     if not (DSN and MEM_PATH):
         return
+    mem_path = MEM_PATH
     with psycopg2.connect(DSN) as conn:
         dedup = load_ingested_hashes(conn)
-        state={'offset':0}
-        # Recover previous offset if we store it in a sidecar? (Future)
+        state={'offset':load_offset(mem_path)}
         while True:
-            mems = [m for m in tail_once(state) if m.content_hash not in dedup]
-            if mems:
-                # batch embed
-                for i in range(0, len(mems), BATCH_SIZE):
-                    batch=mems[i:i+BATCH_SIZE]
-                    vecs=embed_texts([m.text for m in batch])
-                    insert_embeddings(conn, batch, vecs)
-                    mark_hashes(conn, [m.content_hash for m in batch])
-                    dedup.update(m.content_hash for m in batch)
-                print(f"[bridge] Ingested {len(mems)} new memory lines")
-            if ARGS.once:
+            saved_offset = state['offset']
+            mems = [m for m in tail_once(mem_path, state) if m.content_hash not in dedup]
+            # Embed in BATCH_SIZE batches and flush every FLUSH_BATCHES batches so a large
+            # backlog never holds all vectors at once and progress is persisted as it goes
+            pending: List[MemoryLine] = []
+            vecs: List[List[float]] = []
+            for n, i in enumerate(range(0, len(mems), BATCH_SIZE), start=1):
+                batch=mems[i:i+BATCH_SIZE]
+                pending.extend(batch)
+                vecs.extend(embed_texts([m.text for m in batch]))
+                if n % FLUSH_BATCHES == 0:
+                    saved_offset = pending[-1].end_offset
+                    _flush(conn, mem_path, pending, vecs, dedup, saved_offset)
+                    pending, vecs = [], []
+            if pending or state['offset'] != saved_offset:
+                _flush(conn, mem_path, pending, vecs, dedup, state['offset'])
+            if once:
                 break
             time.sleep(LOOP_INTERVAL)
 
@@ -162,13 +246,14 @@ parser = argparse.ArgumentParser()
 parser.add_argument('--once', action='store_true', help='Single pass ingest then exit')
 parser.add_argument('--search', type=str, help='Run a semantic search instead of ingest loop')
 parser.add_argument('--top-k', type=int, default=int(os.getenv('RAG_TOP_K_DEFAULT', '5')))
-ARGS = parser.parse_args()
 
 def main():
-    if ARGS.search:
-        similarity_search(ARGS.search, ARGS.top_k)
+    # Parsed here rather than at import so the helpers can be imported (e.g. by tests)
+    args = parser.parse_args()
+    if args.search:
+        similarity_search(args.search, args.top_k)
     else:
-        process_new()
+        process_new(once=args.once)
 
 if __name__ == '__main__':
     main()
@@ -1,29 +1,55 @@
 """
 Redis Pub/Sub publisher for build/content updates using msgpack.
 Run this script to notify other Copilot agents about new build content.
+
+A single module-level connection pool is shared by every publish so repeated
+calls reuse an open socket instead of reconnecting. Set REDIS_SOCKET to a unix
+socket path to bypass TCP when Redis runs locally.
 """
-def publish_build_update(content: str, extra: dict = None):
-import os
-import redis
-import msgpack
 import logging
+import os
+import threading
 from datetime import datetime, timezone
 
+import msgpack
+import redis
+
 REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
 REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
 REDIS_PASSWORD = os.getenv("REDIS_PASSWORD")
+REDIS_SOCKET = os.getenv("REDIS_SOCKET")
 CHANNEL = os.getenv("REDIS_BUILD_CHANNEL", "build_updates")
 
 logging.basicConfig(level=logging.INFO)
 
+# Connection pool is lazy: no socket is opened until the first command.
+if REDIS_SOCKET:
+    _POOL = redis.ConnectionPool(
+        connection_class=redis.UnixDomainSocketConnection,
+        path=REDIS_SOCKET,
+        password=REDIS_PASSWORD,
+        socket_timeout=5,
+        max_connections=32,
+    )
+else:
+    _POOL = redis.ConnectionPool(
+        host=REDIS_HOST,
+        port=REDIS_PORT,
+        password=REDIS_PASSWORD,
+        socket_timeout=5,
+        max_connections=32,
+    )
+_CLIENT = redis.Redis(connection_pool=_POOL)
+
+# Shared Packer (not thread-safe, hence the lock). Timestamps stay ISO strings so the
+# wire format matches RedisCache.publish_build_update on the same channel.
+_PACKER = msgpack.Packer(use_bin_type=True)
+_PACKER_LOCK = threading.Lock()
+
 def get_redis_client():
-    try:
-        return redis.Redis(host=REDIS_HOST, port=REDIS_PORT, password=REDIS_PASSWORD, socket_timeout=5)
-    except Exception as e:
-        logging.error(f"Redis connection error: {e}")
-        raise
+    return _CLIENT
 
-def publish_build_update(content: str, extra: dict = None):
+def _build_message(content: str, extra: dict | None = None) -> dict:
     message = {
         "type": "build_update",
         "content": content,
@@ -31,7 +57,15 @@ def publish_build_update(content: str, extra: dict = None):
     }
     if extra:
         message.update(extra)
-    packed = msgpack.packb(message)
+    return message
+
+def _pack(message: dict) -> bytes:
+    with _PACKER_LOCK:
+        return _PACKER.pack(message)
+
+def publish_build_update(content: str, extra: dict | None = None):
+    message = _build_message(content, extra)
+    packed = _pack(message)
     r = get_redis_client()
     try:
         r.publish(CHANNEL, packed)
@@ -39,6 +73,24 @@ def publish_build_update(content: str, extra: dict = None):
     except Exception as e:
         logging.error(f"Publish error: {e}")
 
+def publish_many(items: list[tuple[str, dict | None]]) -> int:
+    """Publish several build updates in one round-trip via a non-transactional pipeline.
+
+    Returns the number of messages sent (0 on error).
+    """
+    if not items:
+        return 0
+    pipe = get_redis_client().pipeline(transaction=False)
+    for content, extra in items:
+        pipe.publish(CHANNEL, _pack(_build_message(content, extra)))
+    try:
+        pipe.execute()
+        logging.info(f"Published {len(items)} build updates to {CHANNEL}")
+        return len(items)
+    except Exception as e:
+        logging.error(f"Publish error: {e}")
+        return 0
+
 # Example usage
 if __name__ == "__main__":
     publish_build_update("New build artifact available", {"artifact_path": "/path/to/artifact"})
@@ -14,6 +14,17 @@ def test_health_root():
     assert resp.status_code == 200
     assert resp.json()["status"] == "ok"
 
+def test_health_probe_aliases():
+    for path in ("/healthz", "/readyz"):
+        resp = client.get(path)
+        assert resp.status_code == 200
+        assert resp.json() == {"status": "ok"}
+
+def test_health_probe_rejects_non_get():
+    resp = client.post("/health")
+    assert resp.status_code == 405
+    assert resp.headers["allow"] == "GET"
+
 def test_health_ollama():
     resp = client.get("/health/ollama")
     assert resp.status_code == 200
@@ -24,6 +35,11 @@ def test_health_db():
     assert resp.status_code == 200
     assert "db" in resp.json()
 
+def test_rag_query_missing_query():
+    resp = client.post("/rag/query", json={"top_k": 3})
+    # Typed RAGQueryRequest body -> validation error before retrieval runs
+    assert resp.status_code == 422
+
 def test_rag_pipeline_endpoint_missing_query():
     resp = client.post("/rag/pipeline", json={})
     # Pydantic validation error -> 422
@@ -0,0 +1,63 @@
+"""Tests for DBClient connection pooling (fake psycopg2 connections, no DB)."""
+import threading
+import time
+from types import SimpleNamespace
+
+import psycopg2
+import psycopg2.extensions
+import pytest
+
+import app.rag.db_client as db_client
+from app.rag.db_client import DBClient, PoolExhaustedError
+
+
+class FakeConn:
+    def __init__(self):
+        self.closed = 0
+        self.autocommit = False
+        self.info = SimpleNamespace(transaction_status=psycopg2.extensions.TRANSACTION_STATUS_IDLE)
+
+    def close(self):
+        self.closed = 1
+
+
+def _fresh_pool(monkeypatch, maxconn: int, timeout: float):
+    opened = []
+
+    def fake_connect(*_args, **_kwargs):
+        conn = FakeConn()
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(psycopg2, "connect", fake_connect)
+    monkeypatch.setenv("PG_POOL_MAX", str(maxconn))
+    monkeypatch.setattr(db_client, "_PG_POOL", None)
+    monkeypatch.setattr(db_client, "_PG_POOL_SLOTS", None)
+    monkeypatch.setattr(db_client, "PG_POOL_TIMEOUT", timeout)
+    return opened
+
+
+def test_client_waits_for_released_pool_slot(monkeypatch):
+    _fresh_pool(monkeypatch, maxconn=2, timeout=5.0)
+    held = [DBClient(), DBClient()]
+    served = []
+    t = threading.Thread(target=lambda: served.append(DBClient()))
+    t.start()
+    time.sleep(0.1)
+    assert not served  # blocked on the semaphore rather than PoolError
+    held[0].close()
+    t.join(timeout=2)
+    assert served and served[0].conn is not None
+    served[0].close()
+    held[1].close()
+
+
+def test_client_raises_when_pool_saturated(monkeypatch):
+    opened = _fresh_pool(monkeypatch, maxconn=2, timeout=0.05)
+    held = [DBClient(), DBClient()]
+    with pytest.raises(PoolExhaustedError):
+        DBClient()
+    assert len(opened) <= 2  # no connection opened beyond PG_POOL_MAX
+    for c in held:
+        c.close()
+    DBClient().close()  # slots were not leaked by the failed attempt
@@ -2,7 +2,118 @@
 Sample test for ZenGlow Indexer API.
 TODO: Add tests for API endpoints and RAG pipeline.
 """
+import psycopg2
+import pytest
+
+import app.health.health_router as health_router
+from app.health.health_router import QueryStats, get_query_stats_snapshot, record_query_stats
+
 
 def test_health_endpoint():
     # TODO: Implement test logic
     pass
+
+
+@pytest.fixture
+def fresh_stats(monkeypatch):
+    """Isolate module-level query stats (and snapshot cache) per test."""
+    monkeypatch.setattr(health_router, "query_stats", QueryStats())
+    if health_router._LATENCY_HDR is not None:
+        monkeypatch.setattr(
+            health_router, "_LATENCY_HDR", health_router.HdrHistogram(1, health_router._HDR_MAX_US, 3)
+        )
+    monkeypatch.setattr(health_router, "_SNAPSHOT_DIRTY", True)
+    monkeypatch.setattr(health_router, "_SNAPSHOT_CACHE", {})
+
+
+def test_windowed_percentiles_numpy_path(fresh_stats, monkeypatch):
+    monkeypatch.setattr(health_router, "_LATENCY_HDR", None)
+    samples_ms = [float(v) for v in range(1, 138)]
+    for ms in samples_ms:
+        record_query_stats(ms / 1000.0, "none")
+    snap = get_query_stats_snapshot()
+    ordered = sorted(snap["latencies_ms"])
+    n = len(ordered) - 1
+    assert snap["p50_ms"] == pytest.approx(ordered[int(0.5 * n)])
+    assert snap["p95_ms"] == pytest.approx(ordered[int(0.95 * n)])
+    assert snap["p99_ms"] == pytest.approx(ordered[int(0.99 * n)])
+    assert snap["cumulative_p99_ms"] is None
+
+
+def test_cumulative_percentiles_hdr_path(fresh_stats):
+    if health_router._LATENCY_HDR is None:
+        pytest.skip("hdrh not installed")
+    # Old slow samples fall out of the window but stay in the cumulative histogram
+    for _ in range(100):
+        record_query_stats(1.0, "none")
+    for _ in range(health_router.MAX_LAT_SAMPLES):
+        record_query_stats(0.010, "none")
+    snap = get_query_stats_snapshot()
+    assert snap["p99_ms"] == pytest.approx(10.0)
+    assert snap["cumulative_p50_ms"] == pytest.approx(10.0, rel=1e-2)
+    assert snap["cumulative_p99_ms"] == pytest.approx(1000.0, rel=1e-2)
+
+
+def test_snapshot_cached_until_new_record(fresh_stats, monkeypatch):
+    builds = []
+    real_build = health_router._build_query_stats_snapshot
+
+    def counting_build():
+        builds.append(1)
+        return real_build()
+
+    monkeypatch.setattr(health_router, "_build_query_stats_snapshot", counting_build)
+    record_query_stats(0.005, "full")
+    first = get_query_stats_snapshot()
+    second = get_query_stats_snapshot()
+    # No new records: the same shared dict is returned without rebuilding
+    assert second is first
+    assert len(builds) == 1
+
+    record_query_stats(0.007, "none")
+    third = get_query_stats_snapshot()
+    assert third is not first
+    assert len(builds) == 2
+    assert third["total"] == 2
+    assert first["total"] == 1
+
+
+class _FakeCursor:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, _sql):
+        if self._conn.broken:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+    def fetchone(self):
+        return (1,)
+
+
+class _FakeConn:
+    def __init__(self, broken=False):
+        self.broken = broken
+        self.closed = 0
+        self.autocommit = False
+
+    def cursor(self):
+        return _FakeCursor(self)
+
+    def close(self):
+        self.closed = 1
+
+
+def test_db_probe_retries_stale_health_connection(monkeypatch):
+    stale = _FakeConn(broken=True)
+    fresh = _FakeConn()
+    monkeypatch.setattr(health_router, "_HEALTH_CONN", stale)
+    monkeypatch.setattr(psycopg2, "connect", lambda *a, **k: fresh)
+    assert health_router._probe_db() == {"db": "ok", "result": 1}
+    assert stale.closed
+    assert health_router._HEALTH_CONN is fresh
@@ -0,0 +1,75 @@
+"""Tests for LLMClient edge short-circuit (HTTP session and clock are faked)."""
+from types import SimpleNamespace
+
+import pytest
+
+import app.rag.llm_client as llm_client
+from app.rag.llm_client import LLMClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def edge(monkeypatch):
+    clock = FakeClock()
+    calls = {"post": 0, "head": 0}
+    state = {"post": None, "head_status": 200}
+
+    def fake_post(url, **_kwargs):
+        calls["post"] += 1
+        result = state["post"]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def fake_head(url, **_kwargs):
+        calls["head"] += 1
+        return SimpleNamespace(status_code=state["head_status"])
+
+    monkeypatch.setattr(llm_client, "time", clock)
+    monkeypatch.setattr(llm_client, "SUPABASE_EDGE_URL", "http://edge.invalid")
+    monkeypatch.setattr(llm_client, "SUPABASE_EDGE_KEY", "k")
+    monkeypatch.setattr(llm_client._SESSION, "post", fake_post)
+    monkeypatch.setattr(llm_client._SESSION, "head", fake_head)
+    monkeypatch.setitem(llm_client._EDGE_HEALTH, "ok", True)
+    monkeypatch.setitem(llm_client._EDGE_HEALTH, "ts", 0.0)
+    monkeypatch.setattr(LLMClient, "_invoke_ollama", lambda self, p, t, m: "ollama")
+    return SimpleNamespace(clock=clock, calls=calls, state=state)
+
+
+def test_edge_exception_skips_edge_within_ttl(edge):
+    edge.state["post"] = ConnectionError("edge down")
+    client = LLMClient()
+    assert client.generate("first") == "ollama"
+    assert llm_client._EDGE_HEALTH["ok"] is False
+    edge.clock.now += llm_client.EDGE_HEALTH_TTL / 2
+    assert client.generate("second") == "ollama"
+    # Still inside the TTL: neither the edge nor the HEAD probe is touched
+    assert edge.calls == {"post": 1, "head": 0}
+
+
+def test_edge_5xx_reprobed_after_ttl(edge):
+    edge.state["post"] = SimpleNamespace(status_code=503, json=lambda: {})
+    client = LLMClient()
+    assert client.generate("first") == "ollama"
+    assert llm_client._EDGE_HEALTH["ok"] is False
+
+    # TTL expired but HEAD still failing: stay on Ollama and restart the TTL
+    edge.clock.now += llm_client.EDGE_HEALTH_TTL + 1
+    edge.state["head_status"] = 502
+    assert client.generate("second") == "ollama"
+    assert edge.calls == {"post": 1, "head": 1}
+
+    # TTL expired again and HEAD healthy: edge is used again
+    edge.clock.now += llm_client.EDGE_HEALTH_TTL + 1
+    edge.state["head_status"] = 404
+    edge.state["post"] = SimpleNamespace(status_code=200, json=lambda: {"output": "edge"})
+    assert client.generate("third") == "edge"
+    assert edge.calls == {"post": 2, "head": 2}
+    assert llm_client._EDGE_HEALTH["ok"] is True
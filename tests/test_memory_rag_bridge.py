@@ -0,0 +1,81 @@
+"""Tests for the memory bridge offset sidecar and flush sequencing (no DB or embed server)."""
+import json
+
+import scripts.memory_rag_bridge as bridge
+
+
+def _write_lines(path, texts, trailing=""):
+    path.write_text("".join(json.dumps({"content": t}) + "\n" for t in texts) + trailing)
+
+
+def test_offset_round_trips_and_resets_on_truncation(tmp_path):
+    mem = tmp_path / "memory.jsonl"
+    _write_lines(mem, ["a", "b"])
+    size = mem.stat().st_size
+    bridge.save_offset(str(mem), size)
+    assert bridge.load_offset(str(mem)) == size
+
+    # File replaced by a shorter one: the stale offset points past EOF
+    _write_lines(mem, ["c"])
+    assert bridge.load_offset(str(mem)) == 0
+
+
+def test_tail_once_leaves_unterminated_line(tmp_path):
+    mem = tmp_path / "memory.jsonl"
+    _write_lines(mem, ["a"], trailing='{"content": "b')
+    state = {"offset": 0}
+    assert [m.text for m in bridge.tail_once(str(mem), state)] == ["a"]
+    first_end = state["offset"]
+    assert first_end == len(json.dumps({"content": "a"}) + "\n")
+
+    # Writer finishes the line; the next pass picks it up from the saved offset
+    with open(mem, "a", encoding="utf-8") as f:
+        f.write('"}\n')
+    lines = bridge.tail_once(str(mem), state)
+    assert [m.text for m in lines] == ["b"]
+    assert lines[0].end_offset == state["offset"] == mem.stat().st_size
+
+
+class _FakeConn:
+    def __init__(self, events):
+        self.events = events
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def commit(self):
+        self.events.append(("commit",))
+
+
+def test_process_new_flushes_every_k_batches(tmp_path, monkeypatch):
+    mem = tmp_path / "memory.jsonl"
+    _write_lines(mem, [f"m{i}" for i in range(5)])
+    events = []
+    monkeypatch.setattr(bridge, "DSN", "postgresql://fake")
+    monkeypatch.setattr(bridge, "MEM_PATH", str(mem))
+    monkeypatch.setattr(bridge, "BATCH_SIZE", 2)
+    monkeypatch.setattr(bridge, "FLUSH_BATCHES", 1)
+    monkeypatch.setattr(bridge.psycopg2, "connect", lambda _dsn: _FakeConn(events))
+    monkeypatch.setattr(bridge, "load_ingested_hashes", lambda _conn: set())
+    monkeypatch.setattr(bridge, "embed_texts", lambda texts: [[0.0]] * len(texts))
+    monkeypatch.setattr(
+        bridge, "insert_embeddings",
+        lambda _conn, mems, _vecs: events.append(("insert", [m.text for m in mems])))
+    monkeypatch.setattr(bridge, "mark_hashes", lambda _conn, _hashes: None)
+    monkeypatch.setattr(
+        bridge, "save_offset", lambda _path, offset: events.append(("save", offset)))
+
+    bridge.process_new(once=True)
+
+    line_end = [0]
+    for i in range(5):
+        line_end.append(line_end[-1] + len(json.dumps({"content": f"m{i}"}) + "\n"))
+    # Each flush commits before advancing the offset to the last written line
+    assert events == [
+        ("insert", ["m0", "m1"]), ("commit",), ("save", line_end[2]),
+        ("insert", ["m2", "m3"]), ("commit",), ("save", line_end[4]),
+        ("insert", ["m4"]), ("commit",), ("save", line_end[5]),
+    ]